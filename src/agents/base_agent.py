@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from langchain_core.language_models import BaseChatModel
 from langchain_core.tools import BaseTool
 import logging
@@ -66,3 +66,34 @@ class BaseAgent(ABC):
             Response Dict[str, Any]: Processed response from the agent.
         """
         raise NotImplementedError("Subclasses must implement process_query")
+
+    async def execute_batch(
+        self,
+        queries: List[str],
+        chat_histories: Optional[List[List[Dict[str, Any]]]] = None,
+        max_concurrency: int = 8,
+    ) -> List[Dict[str, Any]]:
+        """
+        Process multiple user queries. The default implementation calls execute
+        sequentially; subclasses may override it with a concurrent or native batch
+        implementation.
+
+        Args:
+            queries: User input queries
+            chat_histories: Optional chat history per query, aligned with queries
+            max_concurrency: Maximum number of queries processed at once. Ignored
+                by the default implementation, which processes one at a time.
+
+        Returns:
+            List[Dict[str, Any]]: Responses from the agent, in query order.
+        """
+        if chat_histories is None:
+            chat_histories = [[] for _ in queries]
+
+        if len(chat_histories) != len(queries):
+            raise ValueError("chat_histories must have the same length as queries.")
+
+        return [
+            await self.execute(query, chat_history=chat_history)
+            for query, chat_history in zip(queries, chat_histories)
+        ]
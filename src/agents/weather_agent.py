@@ -1,12 +1,18 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+import asyncio
+import functools
+import re
 from langchain_core.language_models import BaseChatModel
 from langchain_core.tools import BaseTool
 
 from langchain_core.prompts import ChatPromptTemplate
 
 from langchain.agents import create_tool_calling_agent, AgentExecutor
+from langchain.callbacks.tracers.logging import LoggingCallbackHandler
 
-from tools.weather_tools import get_weather_alert_by_code
+from tools.weather_tools import get_weather_alert_by_code, get_error_message
+from utils.constants import US_STATE_CODES
 from agents.base_agent import BaseAgent
 import logging
 
@@ -14,6 +20,154 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Compiled agent executors keyed by (id(llm), tool ids, id(prompt), verbose),
+# evicted least recently used first. Each cached executor holds references to its
+# llm, tools and prompt, so their ids cannot be reused while the entry is cached.
+_AGENT_CACHE_MAXSIZE = 32
+_AGENT_CACHE: OrderedDict[tuple[int, tuple[int, ...], int, bool], AgentExecutor] = (
+    OrderedDict()
+)
+
+
+_STATE_CODES = frozenset(US_STATE_CODES.values())
+# Uppercase codes are matched case-sensitively so words like "in" or "or" are not
+# mistaken for states; "Washington D.C." is matched before the state names, and
+# longer names come first so "west virginia" wins over "virginia".
+_STATE_PATTERN = re.compile(
+    r"\b(?P<code>[A-Z]{2})\b"
+    r"|\b(?P<dc>(?i:washington,?\s*d\.?\s*c)\b\.?)"
+    r"|\b(?P<name>(?i:"
+    + "|".join(
+        re.escape(name) for name in sorted(US_STATE_CODES, key=len, reverse=True)
+    )
+    + r"))\b"
+)
+_ALERT_INTENT_PATTERN = re.compile(r"\b(alerts?|warnings?)\b", re.IGNORECASE)
+# Queries about other times or about forecasts are left to the agent, since the
+# tool only reports currently active alerts.
+_EXCLUDED_INTENT_PATTERN = re.compile(
+    r"\b(was|were|last|yesterday|ago|history|historical|forecast|tomorrow|next)\b",
+    re.IGNORECASE,
+)
+# Queries that exclude a place are left to the agent.
+_NEGATION_PATTERN = re.compile(
+    r"\b(not|except|excluding|outside|besides)\b", re.IGNORECASE
+)
+# A state name followed by "city" names a city, e.g. "Kansas City".
+_CITY_SUFFIX_PATTERN = re.compile(r"\s+city\b", re.IGNORECASE)
+_SENTENCE_END = (".", "!", "?")
+
+
+def _is_interjection(query: str, match: re.Match) -> bool:
+    """
+    Return True if a matched code is likely a word such as "HI" or "OK" rather than
+    a state: it starts a sentence or is followed by "!" or ",".
+    """
+
+    preceding = query[: match.start()].rstrip()
+    if not preceding or preceding.endswith(_SENTENCE_END):
+        return True
+
+    return query[match.end() : match.end() + 1] in ("!", ",")
+
+
+def _resolve_state_code(query: str) -> Optional[str]:
+    """
+    Resolve the query to a single US state code without calling the LLM.
+
+    Returns the code only when the query asks about current weather alerts and
+    mentions exactly one state; otherwise returns None so the agent handles the
+    query.
+    """
+
+    if not _ALERT_INTENT_PATTERN.search(query):
+        return None
+
+    if _EXCLUDED_INTENT_PATTERN.search(query) or _NEGATION_PATTERN.search(query):
+        return None
+
+    codes = set()
+    for match in _STATE_PATTERN.finditer(query):
+        if match.group("code"):
+            if match.group("code") in _STATE_CODES and not _is_interjection(
+                query, match
+            ):
+                codes.add(match.group("code"))
+        elif match.group("dc"):
+            codes.add("DC")
+        else:
+            if _CITY_SUFFIX_PATTERN.match(query, match.end()):
+                return None
+
+            codes.add(US_STATE_CODES[match.group("name").lower()])
+
+    if len(codes) != 1:
+        return None
+
+    return codes.pop()
+
+
+@functools.lru_cache(maxsize=16)
+def _compile_prompt(tool_names: tuple[str, ...]) -> ChatPromptTemplate:
+    """
+    Build the WeatherAgent prompt for the given tool names. Cached so instances
+    with the same tools share one prompt template.
+    """
+
+    system_prompt = f"""
+    You are a weather assistant that provides weather alerts for specific US states
+    using the get_weather_alert_by_code tool.
+
+    For every user query:
+    1. Identify any US state name or 2-letter code in the input.
+    2. If a state name is provided (e.g., California), convert it to
+        its UPPERCASE 2-letter code (e.g., CA).
+    3. Call the appropriate tool
+    4. Return the tool's output or an appropriate error message
+        if no state is identified or the tool fails.
+
+    Example:
+    User: "What is the weather alert for California?"
+    Assistant: Let me check the weather alerts for CA.
+        [Calls get_weather_alert_by_code with "CA"]
+
+    Available tools: {list(tool_names)}
+    """
+
+    return ChatPromptTemplate.from_messages(
+        [
+            ("system", system_prompt),
+            ("placeholder", "{chat_history}"),
+            ("human", "{input}"),
+            ("placeholder", "{agent_scratchpad}"),
+        ]
+    )
+
+
+def _build_executor(
+    llm: BaseChatModel,
+    tools: List[BaseTool],
+    prompt: ChatPromptTemplate,
+    verbose: bool = False,
+) -> AgentExecutor:
+    """
+    Build a tool calling agent and wrap it in an AgentExecutor. Verbose prints
+    intermediate steps to stdout.
+    """
+
+    agent = create_tool_calling_agent(
+        llm=llm,
+        tools=tools,
+        prompt=prompt,
+    )
+
+    return AgentExecutor(
+        agent=agent,
+        tools=tools,
+        verbose=verbose,
+    )
+
+
 class WeatherAgent(BaseAgent):
     """
     Weather Agent that provides weather information based on city/state codes.
@@ -21,16 +175,26 @@ class WeatherAgent(BaseAgent):
     """
 
     def __init__(
-        self, llm: BaseChatModel, tools: List[BaseTool] = [get_weather_alert_by_code]
+        self,
+        llm: BaseChatModel,
+        tools: Optional[List[BaseTool]] = None,
+        verbose: bool = False,
     ):
         """
         Initialize the WeatherAgent with a language model and tools.
         Args:
             llm (BaseChatModel): The language model to use.
-            tools (List[BaseTool]): List of tools to be used by the agent. If None,
-            defaults to using get_weather_alert_by_code.
+            tools (Optional[List[BaseTool]]): List of tools to be used by the agent.
+            If None, defaults to using get_weather_alert_by_code.
+            verbose (bool): Whether the agent executor prints intermediate steps
+            to stdout. Defaults to False.
         """
 
+        self.verbose = verbose
+
+        if tools is None:
+            tools = [get_weather_alert_by_code]
+
         super().__init__(llm, tools=tools)
 
         self.tool_names = [tool.get_name() for tool in self.tools]
@@ -44,52 +208,35 @@ class WeatherAgent(BaseAgent):
         Initialize the agent prompt for the WeatherAgent.
         """
 
-        system_prompt = f"""
-        You are a weather assistant that provides weather alerts for specific US states
-        using the get_weather_alert_by_code tool.
-
-        For every user query:
-        1. Identify any US state name or 2-letter code in the input.
-        2. If a state name is provided (e.g., California), convert it to
-            its UPPERCASE 2-letter code (e.g., CA).
-        3. Call the appropriate tool
-        4. Return the tool's output or an appropriate error message
-            if no state is identified or the tool fails.
-
-        Example:
-        User: "What is the weather alert for California?"
-        Assistant: Let me check the weather alerts for CA.
-            [Calls get_weather_alert_by_code with "CA"]
-
-        Available tools: {self.tool_names}
-        """
-
-        self.agent_prompt = ChatPromptTemplate.from_messages(
-            [
-                ("system", system_prompt),
-                ("placeholder", "{chat_history}"),
-                ("human", "{input}"),
-                ("placeholder", "{agent_scratchpad}"),
-            ]
-        )
+        self.agent_prompt = _compile_prompt(tuple(self.tool_names))
 
     def _init_agent(self):
         """
-        Initialize the agent with the prompt and tools.
+        Initialize the agent with the prompt and tools, reusing a cached executor
+        for the same language model, tool instances and prompt.
         This method should be called in the subclass constructor.
         """
 
-        self.agent = create_tool_calling_agent(
-            llm=self.llm,
-            tools=self.tools,
-            prompt=self.agent_prompt,
+        key = (
+            id(self.llm),
+            tuple(id(tool) for tool in self.tools),
+            id(self.agent_prompt),
+            self.verbose,
         )
 
-        self.agent_executor = AgentExecutor(
-            agent=self.agent,
-            tools=self.tools,
-            verbose=True,
-        )
+        agent_executor = _AGENT_CACHE.get(key)
+        if agent_executor is None:
+            agent_executor = _build_executor(
+                self.llm, self.tools, self.agent_prompt, verbose=self.verbose
+            )
+            _AGENT_CACHE[key] = agent_executor
+            if len(_AGENT_CACHE) > _AGENT_CACHE_MAXSIZE:
+                _AGENT_CACHE.popitem(last=False)
+        else:
+            _AGENT_CACHE.move_to_end(key)
+
+        self.agent_executor = agent_executor
+        self.agent = agent_executor.agent
 
     async def execute(
         self, query: str, chat_history: List[Dict[str, str]] = None
@@ -114,19 +261,87 @@ class WeatherAgent(BaseAgent):
             # Ensure query is properly formatted
             formatted_query = query.strip()
 
-            logger.info(f"Executing query: {formatted_query}")
+            logger.debug(f"Executing query: {formatted_query}")
 
             if not formatted_query:
                 return {"error": "Empty query provided"}
 
+            if get_weather_alert_by_code in self.tools:
+                code = _resolve_state_code(formatted_query)
+                if code is not None:
+                    logger.debug(f"Resolved state code {code}; skipping the agent")
+                    output = await get_weather_alert_by_code.ainvoke(code)
+                    error = get_error_message(output)
+                    if error is not None:
+                        return {"error": error}
+
+                    return {"input": formatted_query, "output": output}
+
+            # Trace intermediate steps through logging, checked per call so the
+            # cached executor follows the current log level.
+            config = None
+            if logger.isEnabledFor(logging.DEBUG):
+                config = {
+                    "callbacks": [
+                        LoggingCallbackHandler(logger, log_level=logging.DEBUG)
+                    ]
+                }
+
             result = await self.agent_executor.ainvoke(
                 {
                     "input": formatted_query,
                     "chat_history": chat_history,
                     "agent_scratchpad": [],
-                }
+                },
+                config=config,
             )
             return result
         except Exception as e:
             logger.error(f"Failed to execute  query '{query}': {str(e)}")
             return {"error": f"Unable to process the  query: {str(e)}"}
+
+    async def execute_batch(
+        self,
+        queries: List[str],
+        chat_histories: Optional[List[List[Dict[str, str]]]] = None,
+        max_concurrency: int = 8,
+    ) -> List[Dict[str, Any]]:
+        """
+        Process multiple user queries concurrently.
+
+        Args:
+            queries (List[str]): User input queries.
+            chat_histories (Optional[List[List[Dict[str, str]]]]): Chat history
+                per query, aligned with queries. Defaults to empty histories.
+            max_concurrency (int): Maximum number of queries in flight at once,
+                capping pressure on the LLM and weather API.
+
+        Returns:
+            List[Dict[str, Any]]: The responses from the agent, in query order.
+                Unexpected failures are returned as exception instances.
+        """
+
+        if chat_histories is None:
+            chat_histories = [[] for _ in queries]
+
+        if len(chat_histories) != len(queries):
+            raise ValueError("chat_histories must have the same length as queries.")
+
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _one(query: str, chat_history: List[Dict[str, str]]):
+            async with semaphore:
+                return await self.execute(query, chat_history=chat_history)
+
+        logger.info(f"Executing batch of {len(queries)} queries")
+
+        return await asyncio.gather(
+            *[
+                _one(query, chat_history)
+                for query, chat_history in zip(queries, chat_histories)
+            ],
+            return_exceptions=True,
+        )
@@ -7,7 +7,7 @@ from langchain_openai import AzureChatOpenAI
 
 from agents.weather_agent import WeatherAgent
 
-from tools.weather_tools import get_weather_alert_by_code
+from tools.weather_tools import get_weather_alert_by_code, close_client
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -32,11 +32,15 @@ async def main():
 
     chat_history = []
 
-    response = await agent.execute(
-        query="What is the weather alert for California?", chat_history=chat_history
-    )
+    try:
+        response = await agent.execute(
+            query="What is the weather alert for California?",
+            chat_history=chat_history,
+        )
 
-    print("Response:", response)
+        print("Response:", response)
+    finally:
+        await close_client()
 
 
 async def func():
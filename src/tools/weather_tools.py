@@ -1,31 +1,171 @@
 from langchain_core.tools import tool
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator
+import asyncio
+import time
 import httpx
+import ijson
+import json
 import logging
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
 
-from utils.constants import WEATHER_API_BASE, USER_AGENT
+from utils.constants import WEATHER_API_BASE, USER_AGENT, ALERT_CACHE_TTL
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json decoder
+    orjson = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Formatted alert responses keyed by uppercase state code: (timestamp, result).
+_ALERT_CACHE: dict[str, tuple[float, str]] = {}
+# In-flight fetches keyed by state code so concurrent misses share one request.
+_INFLIGHT: dict[str, asyncio.Task] = {}
+
+_ALERT_TEMPLATE = (
+    "Event: {event}\n"
+    "Description: {description}\n"
+    "Severity: {severity}\n"
+    "Area: {areaDesc}\n"
+    "Instructions: {instruction}"
+)
+_ALERT_DEFAULTS = {
+    "event": "Unknown",
+    "description": "No description available",
+    "severity": "Unknown",
+    "areaDesc": "Unknown",
+    "instruction": "No instructions available",
+}
+
+# Uncompressed responses up to this size are parsed in one go. Larger, unsized or
+# compressed responses (whose Content-Length is not the decoded size) are
+# stream-parsed so only the alert properties are materialized.
+_STREAM_MIN_BYTES = 64 * 1024
+
+# Status codes worth retrying: rate limiting and transient server errors.
+_RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Shared client so repeated calls reuse pooled keep-alive connections to the API.
+# Created lazily because pooled connections are bound to the running event loop.
+_CLIENT: httpx.AsyncClient | None = None
+_CLIENT_LOOP: asyncio.AbstractEventLoop | None = None
+
+
+async def _get_client() -> httpx.AsyncClient:
+    """Return the shared client for the running event loop, creating it if needed."""
+    global _CLIENT, _CLIENT_LOOP
+
+    loop = asyncio.get_running_loop()
+    if _CLIENT is not None and not _CLIENT.is_closed and _CLIENT_LOOP is not loop:
+        # The pooled connections belong to another loop; close them before the
+        # client is replaced so they are not leaked.
+        logger.warning(
+            "Replacing a weather API client created on another event loop; "
+            "call close_client() before that loop ends."
+        )
+        stale, _CLIENT, _CLIENT_LOOP = _CLIENT, None, None
+        try:
+            await stale.aclose()
+        except Exception as e:
+            logger.warning(f"Failed to close the previous weather API client: {e}")
+
+    if _CLIENT is None or _CLIENT.is_closed or _CLIENT_LOOP is not loop:
+        _CLIENT = httpx.AsyncClient(
+            base_url=WEATHER_API_BASE,
+            headers={
+                "User-Agent": USER_AGENT,
+                "Accept": "application/geo+json",
+            },
+            http2=True,
+            timeout=httpx.Timeout(10.0),
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        )
+        _CLIENT_LOOP = loop
+
+    return _CLIENT
+
+
+def _get_cached_alert(code: str) -> str | None:
+    """Return the cached alert response for a code if it is still fresh."""
+    entry = _ALERT_CACHE.get(code)
+    if entry is None:
+        return None
+
+    timestamp, result = entry
+    if time.monotonic() - timestamp < ALERT_CACHE_TTL:
+        return result
+
+    return None
+
+
+def clear_cache() -> None:
+    """Clear the cached weather alert responses."""
+    _ALERT_CACHE.clear()
+
+
+def _error_payload(message: str) -> str:
+    """Serialize a tool failure as the JSON {"error": ...} object it returns."""
+    return json.dumps({"error": message})
+
+
+def get_error_message(result: str) -> str | None:
+    """
+    Return the error message if a get_weather_alert_by_code result reports a
+    failure, or None for a regular result.
+    """
+    try:
+        payload = json.loads(result)
+    except ValueError:
+        return None
+
+    if isinstance(payload, dict) and "error" in payload:
+        return payload["error"]
+
+    return None
+
+
+async def close_client() -> None:
+    """
+    Close the shared HTTP client. Call on shutdown of the event loop that used it;
+    the next request creates a fresh client.
+    """
+    global _CLIENT, _CLIENT_LOOP
+
+    client, _CLIENT, _CLIENT_LOOP = _CLIENT, None, None
+    if client is not None:
+        await client.aclose()
+
+
+class _AsyncByteReader:
+    """Expose an async byte iterator as the async file-like object ijson reads."""
 
-def format_alert(alert: Dict[str, Any]) -> str:
-    """Format a weather alert into a string."""
-    props = alert.get("properties", {})
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks
+
+    async def read(self, size: int = -1) -> bytes:
+        # ijson probes the stream type with read(0), which must not consume data.
+        if size == 0:
+            return b""
+
+        return await anext(self._chunks, b"")
+
+
+def format_alert(props: Dict[str, Any]) -> str:
+    """Format the properties of a weather alert into a string."""
     if not props:
         return ""
 
-    return f"""
-        Event: {props.get("event", "Unknown")}
-        Description: {props.get("description", "No description available")}
-        Severity: {props.get("severity", "Unknown")}
-        Area: {props.get("areaDesc", "Unknown")}
-        Instructions: {props.get("instruction", "No instructions available")}
-    """
+    return _ALERT_TEMPLATE.format_map({**_ALERT_DEFAULTS, **props})
 
 
 @tool
-async def get_weather_alert_by_code(code: str) -> str | None:
+async def get_weather_alert_by_code(code: str) -> str:
     """
     Get weather information by city/state code.
 
@@ -34,45 +174,122 @@ async def get_weather_alert_by_code(code: str) -> str | None:
             Eg: "CA" for California, "NY" for New York.
 
     Returns:
-        str: Weather information for the specified city code.
+        str: Weather information for the specified city code, or a JSON object
+            with an "error" key if the weather service could not be reached.
     """
-    # Placeholder implementation
-    logger.info(f"Fetching weather for city code: {code}")
+    code = code.strip().upper()
 
-    headers = {
-        "User-Agent": USER_AGENT,
-        "Accept": "application/geo+json",
-    }
+    cached = _get_cached_alert(code)
+    if cached is not None:
+        logger.info(f"Serving cached weather for city code: {code}")
+        return cached
 
-    url = f"{WEATHER_API_BASE}/alerts/active/area/{code}"
+    task = _INFLIGHT.get(code)
+    if task is None:
+        task = asyncio.ensure_future(_load_weather_alert(code))
+        _INFLIGHT[code] = task
+        task.add_done_callback(lambda _: _INFLIGHT.pop(code, None))
+    else:
+        logger.info(f"Awaiting in-flight request for city code: {code}")
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url=url, headers=headers)
-            response.raise_for_status()  # Raise an error for bad responses
-            result = response.json()
+    # The fetch runs in its own task and every caller awaits it through a shield,
+    # so cancelling one caller affects neither the fetch nor the other callers.
+    return await asyncio.shield(task)
 
-            if not result or "features" not in result:
-                logger.info(
-                    "No features found in the response or unable to fetch alerts."
-                )
-                return "Unable to fetch alerts or No alerts found for the given state."
 
-            if not result.get("features"):
-                logger.info("No alerts found for the given state.")
-                return "No alerts found for the given state."
+async def _load_weather_alert(code: str) -> str:
+    """
+    Fetch the alerts for a state code, caching successful responses.
 
-            alerts = [format_alert(feature) for feature in result["features"]]
+    Args:
+        code (str): The uppercase state code.
 
-            if not alerts:
-                logger.info("No alerts found for the given state.")
-                return "No alerts found for the given state."
+    Returns:
+        str: Formatted alerts, or a JSON error object if the fetch failed.
+    """
+    try:
+        result = await _fetch_weather_alert(code)
+    except httpx.HTTPStatusError as e:
+        logger.error(f"HTTP error occurred: {e}")
+        return _error_payload(
+            f"Weather service returned HTTP {e.response.status_code}."
+        )
+    except Exception as e:
+        logger.error(f"An error occurred: {e}")
+        return _error_payload(f"Unable to fetch weather alerts: {e}")
 
-            return "\n---\n".join(alerts)
+    _ALERT_CACHE[code] = (time.monotonic(), result)
 
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error occurred: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"An error occurred: {e}")
-            return None
+    return result
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Return True for network errors and transient HTTP status codes."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in _RETRYABLE_STATUS_CODES
+
+    return isinstance(exc, httpx.TransportError)
+
+
+@retry(
+    retry=retry_if_exception(_is_retryable),
+    stop=stop_after_attempt(3),
+    wait=wait_exponential_jitter(initial=0.1, max=2.0),
+    reraise=True,
+)
+async def _fetch_weather_alert(code: str) -> str:
+    """
+    Fetch and format the active weather alerts for a state code from the NWS API.
+    Transient failures are retried with exponential backoff.
+
+    Args:
+        code (str): The uppercase state code.
+
+    Returns:
+        str: Formatted alerts.
+
+    Raises:
+        httpx.HTTPError: If the request still fails after retrying.
+    """
+    logger.info(f"Fetching weather for city code: {code}")
+
+    client = await _get_client()
+    async with client.stream("GET", f"/alerts/active/area/{code}") as response:
+        # An unknown area code is an expected outcome, not an error.
+        if response.status_code == 404:
+            logger.info(f"No such state code: {code}")
+            return "No such state code."
+
+        response.raise_for_status()  # Raise an error for bad responses
+
+        content_length = response.headers.get("Content-Length")
+        if (
+            content_length is not None
+            and "Content-Encoding" not in response.headers
+            and int(content_length) <= _STREAM_MIN_BYTES
+        ):
+            await response.aread()
+            if orjson is not None:
+                result = orjson.loads(response.content)
+            else:
+                result = response.json()
+
+            # A body without features is treated as no alerts, matching the
+            # streaming path, which cannot tell the two apart.
+            features = (result or {}).get("features") or []
+            alerts = [format_alert(p) for f in features if (p := f.get("properties"))]
+        else:
+            alerts = [
+                format_alert(props)
+                async for props in ijson.items_async(
+                    _AsyncByteReader(response.aiter_bytes()),
+                    "features.item.properties",
+                )
+                if props
+            ]
+
+    if not alerts:
+        logger.info("No alerts found for the given state.")
+        return "No alerts found for the given state."
+
+    return "\n---\n".join(alerts)